@@ -1,33 +1,119 @@
 import pygame
 import random
 import math
+import os
+import struct
+import tempfile
 
-# Initialize Pygame
-pygame.init()
-
-# Set up display
+# Set up display size (the window itself is only opened in main())
 WIDTH, HEIGHT = 800, 600
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Tank Battle")
-
-# Load and scale images
-def load_scale_image(path, scale_factor):
-    img = pygame.image.load(path).convert_alpha()
-    new_size = (int(WIDTH * scale_factor), int(WIDTH * scale_factor))
-    return pygame.transform.scale(img, new_size)
-
-hero_img = load_scale_image("hero.png", 0.05)  # Green tank
-enemy_img = load_scale_image("enemy.png", 0.05)  # Purple tank
-boss_img = load_scale_image("boss.png", 0.15)  # Red tank
-bullet_img = load_scale_image("bullet.png", 0.02)
-background = pygame.image.load("background.webp").convert()
-background = pygame.transform.scale(background, (WIDTH, HEIGHT))
+SCREEN_RECT = pygame.Rect(0, 0, WIDTH, HEIGHT)
+screen = None
+
+ASSET_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(ASSET_DIR, ".asset_cache")
+
+class AssetManager:
+    """Loads images on first use and keeps the scaled pixels in an on-disk cache.
+
+    Cache files store raw RGBA bytes and are keyed by the source file's mtime
+    and the target size, so editing an image or changing its scale rebuilds it.
+    """
+    HEADER = struct.Struct("<qII")  # source mtime (ns), width, height
+
+    def __init__(self, base_dir, cache_dir):
+        self.base_dir = base_dir
+        self.cache_dir = cache_dir
+        self.specs = {}
+        self.raw_images = {}  # Scaled surfaces straight from the file or cache
+        self.images = {}  # Display-format copies, made once a window exists
+
+    def register(self, name, filename, size, alpha=True):
+        self.specs[name] = (filename, size, alpha)
+
+    def __getitem__(self, name):
+        if name in self.images:
+            return self.images[name]
+        if name not in self.raw_images:
+            self.raw_images[name] = self._load(name)
+        image = self.raw_images[name]
+
+        # Pixel format conversion needs a window; until then hand out the raw surface
+        if pygame.display.get_surface() is None:
+            return image
+        alpha = self.specs[name][2]
+        self.images[name] = image.convert_alpha() if alpha else image.convert()
+        return self.images[name]
+
+    def _load(self, name):
+        filename, size, _ = self.specs[name]
+        path = os.path.join(self.base_dir, filename)
+        mtime = os.stat(path).st_mtime_ns
+        cache_path = os.path.join(self.cache_dir, f"{name}_{size[0]}x{size[1]}.rgba")
+
+        image = self._read_cache(cache_path, mtime, size)
+        if image is None:
+            image = pygame.transform.scale(pygame.image.load(path), size)
+            self._write_cache(cache_path, mtime, image)
+        return image
+
+    def _read_cache(self, cache_path, mtime, size):
+        try:
+            with open(cache_path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) < self.HEADER.size:
+            return None
+        cached_mtime, width, height = self.HEADER.unpack_from(data)
+        pixels = data[self.HEADER.size:]
+        if cached_mtime != mtime or (width, height) != size or len(pixels) != width * height * 4:
+            return None
+        return pygame.image.fromstring(pixels, size, "RGBA")
+
+    def _write_cache(self, cache_path, mtime, image):
+        width, height = image.get_size()
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Each writer gets its own temp file so parallel cold starts never share one
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        except OSError:
+            return  # The cache is only an optimisation
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(self.HEADER.pack(mtime, width, height))
+                f.write(pygame.image.tostring(image, "RGBA"))
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+def scaled_size(scale_factor):
+    side = int(WIDTH * scale_factor)
+    return (side, side)
+
+assets = AssetManager(ASSET_DIR, CACHE_DIR)
+assets.register("hero", "hero.png", scaled_size(0.05))  # Green tank
+assets.register("enemy", "enemy.png", scaled_size(0.05))  # Purple tank
+assets.register("boss", "boss.png", scaled_size(0.15))  # Red tank
+assets.register("bullet", "bullet.png", scaled_size(0.02))
+assets.register("background", "background.webp", (WIDTH, HEIGHT), alpha=False)
 
 # Power-up images
-x2_img = load_scale_image("x2.png", 0.05)
-health_img = load_scale_image("first_aid.png", 0.05)
-invincibility_img = load_scale_image("invinsibility.png", 0.05)
-ammo_img = load_scale_image("ammo_box.png", 0.05)
+assets.register("x2", "x2.png", scaled_size(0.05))
+assets.register("health", "first_aid.png", scaled_size(0.05))
+assets.register("invincibility", "invinsibility.png", scaled_size(0.05))
+assets.register("ammo", "ammo_box.png", scaled_size(0.05))
+
+# Dictionary that defines the properties for each level
+LEVEL_CONFIG = {
+    1: {"enemy_count": 10, "enemy_speed": 1, "enemy_shoot_chance": 0.01},
+    2: {"enemy_count": 20, "enemy_speed": 1.5, "enemy_shoot_chance": 0.02},
+    3: {"enemy_count": 30, "enemy_speed": 2, "enemy_shoot_chance": 0.03},  # Example, final boss stage will follow
+    "boss_level": {"boss_health": 3000, "boss_rapid_fire_duration": 60, "boss_speed": 2},
+}
 
 # Colors
 WHITE = (255, 255, 255)
@@ -50,7 +136,7 @@ class Tank(pygame.sprite.Sprite):
     def move(self, dx, dy):
         self.rect.x += dx * self.speed
         self.rect.y += dy * self.speed
-        self.rect.clamp_ip(screen.get_rect())
+        self.rect.clamp_ip(SCREEN_RECT)
 
     def shoot(self):
         if self.shoot_cooldown == 0 and self.bullets > 0:
@@ -70,7 +156,7 @@ class Tank(pygame.sprite.Sprite):
 
 class Player(Tank):
     def __init__(self, x, y):
-        super().__init__(hero_img, x, y, 3)
+        super().__init__(assets["hero"], x, y, 3)
         self.score = 0
         self.lives = 3
         self.invincible = False
@@ -91,7 +177,7 @@ class Player(Tank):
 
 class Enemy(Tank):
     def __init__(self, x, y):
-        super().__init__(enemy_img, x, y, 1)
+        super().__init__(assets["enemy"], x, y, 1)
         self.direction = pygame.math.Vector2(random.uniform(-1, 1), random.uniform(-1, 1)).normalize()
         self.shoot_chance = 0.01  # Base shooting chance
 
@@ -108,14 +194,17 @@ class Enemy(Tank):
 
 class Boss(Tank):
     def __init__(self, x, y):
-        super().__init__(boss_img, x, y, 1)
+        super().__init__(assets["boss"], x, y, 2)
         self.health = 3000
         self.max_health = 3000
         self.rapid_fire = False
         self.rapid_fire_timer = 0
+        self.rapid_fire_duration = 60  # 1 second of rapid fire
+        self.sway_frames = 0
 
     def update(self):
         super().update()
+        self.sway_frames += 1
         if self.rapid_fire:
             self.rapid_fire_timer -= 1
             if self.rapid_fire_timer <= 0:
@@ -124,19 +213,20 @@ class Boss(Tank):
         
         if not self.rapid_fire and self.shoot_cooldown == 0:
             self.rapid_fire = True
-            self.rapid_fire_timer = 60  # 1 second of rapid fire
+            self.rapid_fire_timer = self.rapid_fire_duration
 
         if self.rapid_fire and self.shoot_cooldown == 0:
             self.shoot_cooldown = 5
             return self.shoot()
 
-        self.rect.y += math.sin(pygame.time.get_ticks() * 0.002) * 2
+        # One radian every 30 frames, the same sway as 0.002 rad/ms at 60 FPS
+        self.rect.y += math.sin(self.sway_frames / 30) * self.speed
         return None
 
 class Bullet(pygame.sprite.Sprite):
     def __init__(self, x, y, speed, moving_right):
         super().__init__()
-        self.image = bullet_img
+        self.image = assets["bullet"]
         self.rect = self.image.get_rect(center=(x, y))
         self.speed = speed
         self.moving_right = moving_right
@@ -150,14 +240,7 @@ class PowerUp(pygame.sprite.Sprite):
     def __init__(self, x, y, power_up_type):
         super().__init__()
         self.type = power_up_type
-        if power_up_type == "x2":
-            self.image = x2_img
-        elif power_up_type == "health":
-            self.image = health_img
-        elif power_up_type == "invincibility":
-            self.image = invincibility_img
-        elif power_up_type == "ammo":
-            self.image = ammo_img
+        self.image = assets[power_up_type]
         self.rect = self.image.get_rect(center=(x, y))
         self.duration = random.randint(300, 600)  # 5-10 seconds at 60 FPS
 
@@ -166,8 +249,37 @@ class PowerUp(pygame.sprite.Sprite):
         if self.rect.top > HEIGHT:
             self.kill()
 
-def spawn_enemy():
-    return Enemy(WIDTH, random.randint(0, HEIGHT - enemy_img.get_height()))
+class UpdateScheduler:
+    """Updates every entity exactly once per tick, one entity type at a time.
+
+    Entities that fire return the new projectile from update(); tick() hands
+    those back to the caller instead of them being collected by a second pass.
+    """
+    def __init__(self, *groups):
+        self.groups = groups
+
+    def tick(self):
+        spawned = []
+        for group in self.groups:
+            for entity in group.sprites():
+                projectile = entity.update()
+                if projectile is not None:
+                    spawned.append(projectile)
+        return spawned
+
+def spawn_enemy(config):
+    enemy = Enemy(WIDTH, random.randint(0, HEIGHT - assets["enemy"].get_height()))
+    enemy.speed = config["enemy_speed"]
+    enemy.shoot_chance = config["enemy_shoot_chance"]
+    return enemy
+
+def spawn_boss(config):
+    boss = Boss(WIDTH, HEIGHT // 2)
+    boss.health = config["boss_health"]
+    boss.max_health = config["boss_health"]
+    boss.rapid_fire_duration = config["boss_rapid_fire_duration"]
+    boss.speed = config["boss_speed"]
+    return boss
 
 def spawn_power_up():
     x = random.randint(50, WIDTH - 50)
@@ -175,6 +287,18 @@ def spawn_power_up():
     power_up_type = random.choice(["x2", "health", "invincibility", "ammo"])
     return PowerUp(x, y, power_up_type)
 
+def apply_power_up(player, power_up):
+    if power_up.type == "x2":
+        player.score_multiplier = 2
+        player.score_multiplier_timer = power_up.duration
+    elif power_up.type == "health":
+        player.health = min(player.health + 20, player.max_health)
+    elif power_up.type == "invincibility":
+        player.invincible = True
+        player.invincible_timer = power_up.duration
+    elif power_up.type == "ammo":
+        player.bullets = min(player.bullets + 20, player.max_health)
+
 def show_victory_screen():
     font = pygame.font.Font(None, 74)
     text = font.render("Level Complete!", True, GREEN)
@@ -224,13 +348,25 @@ def draw_progress_bar(screen, progress, max_progress):
     # Draw the filled part of the progress bar
     pygame.draw.rect(screen, GREEN, (bar_x, bar_y + bar_height - progress_height, bar_width, progress_height))
 
+def init_display():
+    """Initialises Pygame and opens the game window."""
+    global screen
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Tank Battle")
+    return screen
+
 def main():
+    init_display()
+    background = assets["background"]
     clock = pygame.time.Clock()
     player = Player(WIDTH // 4, HEIGHT // 2)
     all_sprites = pygame.sprite.Group(player)
     enemies = pygame.sprite.Group()
+    bosses = pygame.sprite.Group()
     bullets = pygame.sprite.Group()
     power_ups = pygame.sprite.Group()
+    scheduler = UpdateScheduler(pygame.sprite.Group(player), enemies, bosses, bullets, power_ups)
     
     score = 0
     high_score = 0
@@ -243,21 +379,13 @@ def main():
     game_over = False
     running = True
 
-    # Dictionary that defines the properties for each level
-    level_config = {
-        1: {"enemy_count": 10, "enemy_speed": 1, "enemy_shoot_chance": 0.01},
-        2: {"enemy_count": 20, "enemy_speed": 1.5, "enemy_shoot_chance": 0.02},
-        3: {"enemy_count": 30, "enemy_speed": 2, "enemy_shoot_chance": 0.03},  # Example, final boss stage will follow
-        "boss_level": {"boss_health": 3000, "boss_rapid_fire_duration": 60, "boss_speed": 2},
-    }
-
     def start_level(level_number):
         """Sets up the enemy count needed to progress the level."""
         nonlocal enemies_killed, max_enemies, boss
         boss = None  # Reset boss if it exists
         enemies_killed = 0  # Reset enemies killed counter
-        if level_number in level_config:
-            max_enemies = level_config[level_number]["enemy_count"]
+        if level_number in LEVEL_CONFIG:
+            max_enemies = LEVEL_CONFIG[level_number]["enemy_count"]
         else:
             max_enemies = 0  # No enemies for undefined levels
 
@@ -278,8 +406,10 @@ def main():
                     player = Player(WIDTH // 4, HEIGHT // 2)
                     all_sprites = pygame.sprite.Group(player)
                     enemies = pygame.sprite.Group()
+                    bosses = pygame.sprite.Group()
                     bullets = pygame.sprite.Group()
                     power_ups = pygame.sprite.Group()
+                    scheduler = UpdateScheduler(pygame.sprite.Group(player), enemies, bosses, bullets, power_ups)
                     score = 0
                     level = 1
                     boss = None
@@ -299,9 +429,7 @@ def main():
 
             # Ensure there are always enemies on screen
             if len(enemies) < 5 and not boss:
-                enemy = spawn_enemy()
-                enemy.speed = level_config[level]["enemy_speed"]
-                enemy.shoot_chance = level_config[level]["enemy_shoot_chance"]
+                enemy = spawn_enemy(LEVEL_CONFIG[level])
                 enemies.add(enemy)
                 all_sprites.add(enemy)
 
@@ -311,22 +439,10 @@ def main():
                 power_ups.add(power_up)
                 all_sprites.add(power_up)
 
-            # Update all sprites
-            all_sprites.update()
-
-            # Enemy shooting
-            for enemy in enemies:
-                enemy_bullet = enemy.update()
-                if enemy_bullet:
-                    bullets.add(enemy_bullet)
-                    all_sprites.add(enemy_bullet)
-
-            # Boss shooting
-            if boss:
-                boss_bullet = boss.update()
-                if boss_bullet:
-                    bullets.add(boss_bullet)
-                    all_sprites.add(boss_bullet)
+            # Update every entity once and collect enemy and boss shots
+            for enemy_bullet in scheduler.tick():
+                bullets.add(enemy_bullet)
+                all_sprites.add(enemy_bullet)
 
             # Collision detection
             for bullet in bullets:
@@ -368,22 +484,14 @@ def main():
             # Power-up collection
             power_up_hits = pygame.sprite.spritecollide(player, power_ups, True)
             for power_up in power_up_hits:
-                if power_up.type == "x2":
-                    player.score_multiplier = 2
-                    player.score_multiplier_timer = power_up.duration
-                elif power_up.type == "health":
-                    player.health = min(player.health + 20, player.max_health)
-                elif power_up.type == "invincibility":
-                    player.invincible = True
-                    player.invincible_timer = power_up.duration
-                elif power_up.type == "ammo":
-                    player.bullets = min(player.bullets + 20, player.max_health)
+                apply_power_up(player, power_up)
 
             # Level progression: check if the required number of enemies are shot down
             if all_enemies_defeated() and not boss:
                 if level == 3:
                     # Trigger boss level after level 3
-                    boss = Boss(WIDTH, HEIGHT // 2)
+                    boss = spawn_boss(LEVEL_CONFIG["boss_level"])
+                    bosses.add(boss)
                     all_sprites.add(boss)
                 else:
                     if show_victory_screen():
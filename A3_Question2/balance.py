@@ -0,0 +1,229 @@
+"""Monte-Carlo balancing sweeps for Tank Battle's LEVEL_CONFIG.
+
+Runs many seeded simulations of the game's Player/Enemy/Boss logic with a
+scripted bot, without a window or frame pacing, spread over a process pool.
+
+The boss stage is limited by ammo: the player starts with 50 bullets and
+each ammo box adds 20, while the boss needs boss_health / 10 hits. Expect
+long clear times there: runs that reach --max-seconds count as not cleared,
+so raise it when sweeping the boss.
+
+Examples:
+    python balance.py --level 2 --runs 200
+    python balance.py --level 3 --set enemy_speed=1.5,2,2.5 --set enemy_shoot_chance=0.02,0.03
+    python balance.py --level boss_level --max-seconds 900 --set boss_health=2000,3000
+"""
+import argparse
+import importlib.util
+import itertools
+import os
+import random
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+
+import pygame
+
+# 2D_Game.py is not a valid module name, so load it from its path
+_spec = importlib.util.spec_from_file_location(
+    "tank_battle", os.path.join(os.path.dirname(os.path.abspath(__file__)), "2D_Game.py"))
+game = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(game)
+
+FPS = 60
+MAX_SECONDS = 300  # Default game time before a run is given up
+DODGE_DISTANCE = 80
+HOME_X = game.WIDTH // 4
+LOW_AMMO = 10
+
+def sign(value, dead_zone=0):
+    return 0 if abs(value) <= dead_zone else (1 if value > 0 else -1)
+
+def bot_input(player, targets, bullets, power_ups):
+    """Returns (dx, dy, fire) for a simple scripted player."""
+    # Step out of the lane of any enemy bullet that is about to hit
+    for bullet in bullets:
+        if bullet.moving_right:
+            continue
+        if 0 <= bullet.rect.left - player.rect.right < DODGE_DISTANCE and \
+                abs(bullet.rect.centery - player.rect.centery) < player.rect.height:
+            return 0, (1 if bullet.rect.centery <= player.rect.centery else -1), False
+
+    # Player bullets only fly right from the left half, so only leave it for ammo
+    wanted = [p for p in power_ups if p.rect.right < game.WIDTH // 2 or
+              (p.type == "ammo" and player.bullets < LOW_AMMO)]
+    if wanted:
+        power_up = min(wanted, key=lambda p: abs(p.rect.centerx - player.rect.centerx))
+        dx = sign(power_up.rect.centerx - player.rect.centerx, player.speed)
+        dy = sign(power_up.rect.centery - player.rect.centery, player.speed)
+    else:
+        dx = sign(HOME_X - player.rect.centerx, player.speed)
+        dy = 0
+
+    if not targets:
+        return dx, dy, False
+
+    # Line up with the closest target and fire when it is in the lane
+    target = min(targets, key=lambda t: t.rect.left)
+    offset = target.rect.centery - player.rect.centery
+    if not wanted:
+        dy = sign(offset, player.speed)
+    return dx, dy, abs(offset) < target.rect.height // 2
+
+def simulate(level, config, seed, max_seconds=MAX_SECONDS):
+    """Plays one stage with the scripted bot and returns its outcome."""
+    max_frames = int(max_seconds * FPS)
+    random.seed(seed)
+    player = game.Player(game.WIDTH // 4, game.HEIGHT // 2)
+    enemies = pygame.sprite.Group()
+    bullets = pygame.sprite.Group()
+    power_ups = pygame.sprite.Group()
+    bosses = pygame.sprite.Group()
+    boss = game.spawn_boss(config) if level == "boss_level" else None
+    if boss:
+        bosses.add(boss)
+    scheduler = game.UpdateScheduler(pygame.sprite.Group(player), enemies, bosses, bullets, power_ups)
+    enemy_goal = config.get("enemy_count", 0)
+
+    kills = 0
+    damage_taken = 0
+    shots = 0
+    cleared = False
+    frame = 0
+    while frame < max_frames and player.lives > 0 and not cleared:
+        frame += 1
+
+        dx, dy, fire = bot_input(player, [boss] if boss else enemies.sprites(), bullets, power_ups)
+        player.move(dx, dy)
+        if fire:
+            bullet = player.shoot()
+            if bullet:
+                bullets.add(bullet)
+                shots += 1
+
+        if len(enemies) < 5 and not boss:
+            enemies.add(game.spawn_enemy(config))
+        if random.random() < 0.005:
+            power_ups.add(game.spawn_power_up())
+
+        bullets.add(scheduler.tick())
+
+        for bullet in bullets:
+            if bullet.moving_right:  # Player's bullet
+                hit_enemies = pygame.sprite.spritecollide(bullet, enemies, True)
+                if hit_enemies:
+                    kills += len(hit_enemies)
+                    bullet.kill()
+                if boss and bullet.rect.colliderect(boss.rect):
+                    boss.health -= 10
+                    bullet.kill()
+                    if boss.health <= 0:
+                        cleared = True
+            elif not player.invincible and bullet.rect.colliderect(player.rect):
+                player.health -= 10
+                damage_taken += 10
+                bullet.kill()
+                if player.health <= 0:
+                    player.lives -= 1
+                    if player.lives > 0:
+                        player.health = player.max_health
+
+        for power_up in pygame.sprite.spritecollide(player, power_ups, True):
+            game.apply_power_up(player, power_up)
+
+        if not boss and kills >= enemy_goal:
+            cleared = True
+
+    return {
+        "cleared": cleared,
+        "seconds": frame / FPS,
+        "damage_taken": damage_taken,
+        "lives_lost": 3 - player.lives,
+        "shots": shots,
+        "kills": kills,
+    }
+
+def run_batch(level, config, seeds, max_seconds):
+    return [simulate(level, config, seed, max_seconds) for seed in seeds]
+
+def summarise(results):
+    cleared = [r for r in results if r["cleared"]]
+    clear_times = [r["seconds"] for r in cleared]
+    return {
+        "runs": len(results),
+        "clear_rate": len(cleared) / len(results),
+        "mean_clear_s": statistics.mean(clear_times) if clear_times else float("nan"),
+        "median_clear_s": statistics.median(clear_times) if clear_times else float("nan"),
+        "mean_damage": statistics.mean(r["damage_taken"] for r in results),
+        "mean_lives_lost": statistics.mean(r["lives_lost"] for r in results),
+    }
+
+def sweep(level, grid, runs, seed=0, workers=None, chunk_size=10, max_seconds=MAX_SECONDS):
+    """Evaluates every combination in grid and returns (overrides, summary) pairs.
+
+    All configurations are played with the same seeds so they can be compared
+    directly.
+    """
+    keys = list(grid)
+    combos = [dict(zip(keys, values)) for values in itertools.product(*grid.values())]
+    seeds = list(range(seed, seed + runs))
+    chunks = [seeds[i:i + chunk_size] for i in range(0, len(seeds), chunk_size)]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = []
+        for overrides in combos:
+            config = dict(game.LEVEL_CONFIG[level], **overrides)
+            futures.append([pool.submit(run_batch, level, config, chunk, max_seconds) for chunk in chunks])
+        return [(overrides, summarise([r for f in batch for r in f.result()]))
+                for overrides, batch in zip(combos, futures)]
+
+def parse_number(text):
+    value = float(text)
+    return int(value) if value.is_integer() and "." not in text else value
+
+def parse_grid(settings):
+    grid = {}
+    for setting in settings:
+        key, _, values = setting.partition("=")
+        if not values:
+            raise argparse.ArgumentTypeError(f"expected key=v1,v2,... but got {setting!r}")
+        grid[key] = [parse_number(v) for v in values.split(",")]
+    return grid
+
+def parse_level(text):
+    return int(text) if text.isdigit() else text
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte-Carlo balancing sweeps for Tank Battle")
+    parser.add_argument("--level", type=parse_level, default=1, choices=list(game.LEVEL_CONFIG),
+                        help="stage to simulate (1, 2, 3 or boss_level)")
+    parser.add_argument("--set", dest="settings", action="append", default=[], metavar="KEY=V1,V2",
+                        help="config values to sweep; repeat to build a grid")
+    parser.add_argument("--runs", type=int, default=100, help="simulations per configuration")
+    parser.add_argument("--max-seconds", type=float, default=MAX_SECONDS,
+                        help="game time before a run counts as not cleared")
+    parser.add_argument("--seed", type=int, default=0, help="first seed")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    args = parser.parse_args()
+    if args.runs < 1:
+        parser.error("--runs must be at least 1")
+    if args.max_seconds <= 0:
+        parser.error("--max-seconds must be positive")
+
+    try:
+        grid = parse_grid(args.settings)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    unknown = set(grid) - set(game.LEVEL_CONFIG[args.level])
+    if unknown:
+        parser.error(f"unknown config keys for level {args.level}: {', '.join(sorted(unknown))}")
+
+    results = sweep(args.level, grid, args.runs, args.seed, args.workers, max_seconds=args.max_seconds)
+
+    header = list(grid) + ["clear_rate", "mean_clear_s", "median_clear_s", "mean_damage", "mean_lives_lost"]
+    print("  ".join(f"{h:>15}" for h in header))
+    for overrides, summary in results:
+        row = [overrides[k] for k in grid] + [summary[h] for h in header[len(grid):]]
+        print("  ".join(f"{v:>15.3f}" if isinstance(v, float) else f"{v:>15}" for v in row))
+
+if __name__ == "__main__":
+    main()
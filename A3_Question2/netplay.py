@@ -0,0 +1,704 @@
+"""Two-player Tank Battle over UDP.
+
+The host runs the authoritative simulation and streams delta-compressed,
+quantised snapshots of every tank, bullet and power-up. The client
+interpolates what it receives and predicts its own tank from local input.
+
+Examples:
+    python netplay.py host --port 50007
+    python netplay.py join 192.168.1.20 --port 50007
+    python netplay.py selftest --seconds 120 --loss 0.1 --delay 60
+    python netplay.py selftest --loss 0.1 --delay 60 --jitter 20 --start-level boss
+"""
+import argparse
+import collections
+import heapq
+import importlib.util
+import itertools
+import math
+import os
+import random
+import socket
+import struct
+import time
+
+import pygame
+
+# 2D_Game.py is not a valid module name, so load it from its path
+_spec = importlib.util.spec_from_file_location(
+    "tank_battle", os.path.join(os.path.dirname(os.path.abspath(__file__)), "2D_Game.py"))
+game = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(game)
+
+TICK_RATE = 60
+SNAPSHOT_INTERVAL = 2  # Send a snapshot every other tick (30 Hz)
+HISTORY = 64  # Snapshots kept on both ends as delta baselines
+INTERP_DELAY = 6  # Client renders remote entities this many ticks in the past
+INPUT_REDUNDANCY = 4  # Recent inputs repeated in every packet to ride out loss
+MAX_QUEUED_INPUTS = INPUT_REDUNDANCY * 2  # Older inputs are dropped past this
+BULLET_SPEED = 5
+UDP_IP_OVERHEAD = 28  # IPv4 + UDP header bytes on every datagram
+TICK_MASK = 0x7FFF  # Spawn ticks are stored in 15 bits so they fit a signed field
+
+MSG_INPUT = 1
+MSG_SNAPSHOT = 2
+
+# Entity kinds; power-ups follow in POWER_UP_TYPES order
+KIND_PLAYER1, KIND_PLAYER2, KIND_ENEMY, KIND_BOSS, KIND_BULLET = range(5)
+POWER_UP_TYPES = ["x2", "health", "invincibility", "ammo"]
+KIND_POWER_UP = 5
+TANK_IMAGES = {KIND_PLAYER1: "hero", KIND_PLAYER2: "hero", KIND_ENEMY: "enemy", KIND_BOSS: "boss"}
+
+# Every entity is (kind, x, y, a, b). Tanks send their centre, quantised
+# health in a and flags in b. Bullets and power-ups move in straight lines,
+# so they send where and when they were first seen and never change again.
+FIELD_COUNT = 5
+INPUT_HEADER = struct.Struct("<BIIIB")  # type, input seq, snapshot ack, client time (ms), input count
+# type, seq, baseline, tick, input ack, echoed time, hold (ms), score, level, game over
+SNAPSHOT_HEADER = struct.Struct("<BIIIIIHIBB")
+ENTITY_HEADER = struct.Struct("<HB")  # id, changed field mask
+FIELD = struct.Struct("<h")
+COUNT = struct.Struct("<H")
+
+def encode_input(dx, dy, fire):
+    return (dx + 1) | ((dy + 1) << 2) | (int(fire) << 4)
+
+def decode_input(value):
+    return (value & 3) - 1, ((value >> 2) & 3) - 1, bool(value & 16)
+
+def encode_snapshot(header, state, baseline_state):
+    """Packs state as a delta against baseline_state (an empty dict for a full snapshot)."""
+    removed = [entity_id for entity_id in baseline_state if entity_id not in state]
+    parts = [SNAPSHOT_HEADER.pack(MSG_SNAPSHOT, *header), COUNT.pack(len(removed))]
+    parts.extend(COUNT.pack(entity_id) for entity_id in removed)
+
+    changed = []
+    for entity_id, fields in state.items():
+        old = baseline_state.get(entity_id)
+        mask = 0
+        for i in range(FIELD_COUNT):
+            if old is None or old[i] != fields[i]:
+                mask |= 1 << i
+        if mask:
+            changed.append(ENTITY_HEADER.pack(entity_id, mask) +
+                           b"".join(FIELD.pack(fields[i]) for i in range(FIELD_COUNT) if mask & (1 << i)))
+    parts.append(COUNT.pack(len(changed)))
+    parts.extend(changed)
+    return b"".join(parts)
+
+def decode_snapshot(data, baselines):
+    """Returns (header, state), or None if the delta baseline is no longer known."""
+    header = SNAPSHOT_HEADER.unpack_from(data)[1:]
+    baseline = header[1]
+    if baseline and baseline not in baselines:
+        return None
+    state = dict(baselines[baseline]) if baseline else {}
+
+    offset = SNAPSHOT_HEADER.size
+    (removed_count,) = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    for _ in range(removed_count):
+        (entity_id,) = COUNT.unpack_from(data, offset)
+        offset += COUNT.size
+        state.pop(entity_id, None)
+
+    (changed_count,) = COUNT.unpack_from(data, offset)
+    offset += COUNT.size
+    for _ in range(changed_count):
+        entity_id, mask = ENTITY_HEADER.unpack_from(data, offset)
+        offset += ENTITY_HEADER.size
+        fields = list(state.get(entity_id, (0,) * FIELD_COUNT))
+        for i in range(FIELD_COUNT):
+            if mask & (1 << i):
+                (fields[i],) = FIELD.unpack_from(data, offset)
+                offset += FIELD.size
+        state[entity_id] = tuple(fields)
+    return header, state
+
+def resolve(fields, tick):
+    """Returns the (kind, x, y, a, b) an entity has at the given tick."""
+    kind, x, y, a, b = fields
+    age = (tick - a) & TICK_MASK
+    if age > TICK_MASK // 2:
+        age -= TICK_MASK + 1  # Asked for a tick before the entity was first seen
+    if kind == KIND_BULLET:
+        return kind, x + (BULLET_SPEED if b else -BULLET_SPEED) * age, y, a, b
+    if kind >= KIND_POWER_UP:
+        return kind, x, y + age, a, b
+    return fields
+
+class NetStats:
+    def __init__(self, clock):
+        self.clock = clock
+        self.started = clock()
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.packets_sent = 0
+        self.packets_received = 0
+        self.packets_dropped = 0
+        self.largest_packet = 0
+        self.rtt_ms = None
+
+    def record_rtt(self, sample_ms):
+        # Samples exclude the host's hold time but can still include up to a
+        # frame of socket polling on each end. Smooth them like TCP's SRTT so
+        # the HUD does not flicker.
+        self.rtt_ms = sample_ms if self.rtt_ms is None else self.rtt_ms * 0.875 + sample_ms * 0.125
+
+    def summary(self):
+        # Rates count UDP/IP headers too, since that is what the link carries
+        elapsed = max(self.clock() - self.started, 1e-9)
+        wire_sent = self.bytes_sent + self.packets_sent * UDP_IP_OVERHEAD
+        wire_received = self.bytes_received + self.packets_received * UDP_IP_OVERHEAD
+        return {
+            "up_kbps": wire_sent * 8 / 1000 / elapsed,
+            "down_kbps": wire_received * 8 / 1000 / elapsed,
+            "packets_sent": self.packets_sent,
+            "packets_received": self.packets_received,
+            "packets_dropped": self.packets_dropped,
+            "largest_packet": self.largest_packet,
+            "rtt_ms": self.rtt_ms,
+        }
+
+class LossyLink:
+    """Non-blocking UDP socket that can drop and delay outgoing packets."""
+    def __init__(self, sock, loss=0.0, delay=0.0, jitter=0.0, clock=time.monotonic, rng=None):
+        sock.setblocking(False)
+        self.sock = sock
+        self.loss = loss
+        self.delay = delay
+        self.jitter = jitter
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.outbox = []
+        self.order = itertools.count()
+        self.stats = NetStats(clock)
+
+    def send(self, data, addr):
+        self.stats.packets_sent += 1
+        self.stats.bytes_sent += len(data)
+        self.stats.largest_packet = max(self.stats.largest_packet, len(data))
+        if self.rng.random() < self.loss:
+            self.stats.packets_dropped += 1
+            return
+        due = self.clock() + self.delay + self.rng.uniform(0, self.jitter)
+        heapq.heappush(self.outbox, (due, next(self.order), data, addr))
+        self.flush()
+
+    def flush(self):
+        now = self.clock() + 1e-6  # Do not hold a packet back a frame over float rounding
+        while self.outbox and self.outbox[0][0] <= now:
+            _, _, data, addr = heapq.heappop(self.outbox)
+            self.sock.sendto(data, addr)
+
+    def receive(self):
+        self.flush()
+        packets = []
+        while True:
+            try:
+                data, addr = self.sock.recvfrom(65535)
+            except (BlockingIOError, ConnectionResetError):
+                return packets
+            self.stats.packets_received += 1
+            self.stats.bytes_received += len(data)
+            packets.append((data, addr))
+
+class HostGame:
+    """Authoritative two-player simulation that follows the rules of main()."""
+    def __init__(self, start_level=1):
+        self.reset(start_level)
+
+    def reset(self, start_level=1):
+        self.players = [game.Player(game.WIDTH // 4, game.HEIGHT // 3),
+                        game.Player(game.WIDTH // 4, game.HEIGHT * 2 // 3)]
+        self.players[0].net_id = 1
+        self.players[1].net_id = 2
+        self.next_id = itertools.count()
+        self.player_group = pygame.sprite.Group(self.players)
+        self.enemies = pygame.sprite.Group()
+        self.bosses = pygame.sprite.Group()
+        self.bullets = pygame.sprite.Group()
+        self.power_ups = pygame.sprite.Group()
+        self.scheduler = game.UpdateScheduler(self.player_group, self.enemies, self.bosses,
+                                              self.bullets, self.power_ups)
+        self.tick = 0
+        self.score = 0
+        self.game_over = False
+        self.boss = None
+        if start_level == "boss":
+            self.level = 3
+            self.spawn_boss()
+        else:
+            self.level = start_level
+        self.enemies_killed = 0
+
+    def spawn_boss(self):
+        self.boss = game.spawn_boss(game.LEVEL_CONFIG["boss_level"])
+        self.bosses.add(self.boss)
+
+    def apply_input(self, player, dx, dy, fire):
+        if player.lives <= 0 or self.game_over:
+            return
+        player.move(dx, dy)
+        if fire:
+            bullet = player.shoot()
+            if bullet:
+                bullet.owner = player  # Kills are scored with the shooter's multiplier
+                self.bullets.add(bullet)
+
+    def step(self):
+        if self.game_over:
+            return
+        self.tick += 1
+
+        config = game.LEVEL_CONFIG[self.level]
+        if len(self.enemies) < 5 and not self.boss:
+            self.enemies.add(game.spawn_enemy(config))
+        if random.random() < 0.005:
+            self.power_ups.add(game.spawn_power_up())
+
+        for bullet in self.scheduler.tick():
+            bullet.owner = None  # Fired by an enemy or the boss
+            self.bullets.add(bullet)
+
+        for bullet in self.bullets:
+            if bullet.moving_right:  # Usually a player's, but enemies in the left half fire right too
+                multiplier = bullet.owner.score_multiplier if bullet.owner else 1
+                hit_enemies = pygame.sprite.spritecollide(bullet, self.enemies, True)
+                if hit_enemies:
+                    self.score += 100 * len(hit_enemies) * multiplier
+                    self.enemies_killed += len(hit_enemies)
+                    bullet.kill()
+                if self.boss and bullet.rect.colliderect(self.boss.rect):
+                    self.boss.health -= 10
+                    bullet.kill()
+                    if self.boss.health <= 0:
+                        self.boss.kill()
+                        self.boss = None
+                        self.score += 1000 * multiplier
+                        self.game_over = True
+            else:
+                for player in self.player_group:
+                    if not player.invincible and bullet.rect.colliderect(player.rect):
+                        player.health -= 10
+                        bullet.kill()
+                        if player.health <= 0:
+                            player.lives -= 1
+                            player.health = player.max_health
+                            if player.lives <= 0:
+                                player.kill()
+                        break
+
+        for player in self.player_group:
+            for power_up in pygame.sprite.spritecollide(player, self.power_ups, True):
+                game.apply_power_up(player, power_up)
+
+        if not self.player_group:
+            self.game_over = True
+        elif not self.boss and self.enemies_killed >= config["enemy_count"]:
+            self.enemies_killed = 0
+            if self.level == 3:
+                self.spawn_boss()
+            else:
+                self.level += 1
+
+    def state(self):
+        """Returns the quantised {net_id: fields} view of every live entity."""
+        state = {}
+        for player in self.players:
+            if player.lives > 0:
+                kind = KIND_PLAYER1 if player.net_id == 1 else KIND_PLAYER2
+                flags = int(player.invincible) | (player.lives << 1) | (player.bullets << 3)
+                state[player.net_id] = (kind, player.rect.centerx, player.rect.centery,
+                                        self.quantise_health(player), flags)
+        for kind, group in ((KIND_ENEMY, self.enemies), (KIND_BOSS, self.bosses)):
+            for tank in group:
+                state[self.net_id(tank)] = (kind, tank.rect.centerx, tank.rect.centery,
+                                            self.quantise_health(tank), 0)
+        for bullet in self.bullets:
+            state[self.net_id(bullet)] = self.origin(bullet, KIND_BULLET, int(bullet.moving_right))
+        for power_up in self.power_ups:
+            state[self.net_id(power_up)] = self.origin(
+                power_up, KIND_POWER_UP + POWER_UP_TYPES.index(power_up.type), 0)
+        return state
+
+    def net_id(self, sprite):
+        if not hasattr(sprite, "net_id"):
+            sprite.net_id = 3 + next(self.next_id) % (0xFFFF - 3)  # 1 and 2 are the players
+        return sprite.net_id
+
+    def origin(self, sprite, kind, b):
+        # Straight-line movers are described once, by where and when they were first seen
+        if not hasattr(sprite, "net_origin"):
+            sprite.net_origin = (kind, sprite.rect.centerx, sprite.rect.centery, self.tick & TICK_MASK, b)
+        return sprite.net_origin
+
+    @staticmethod
+    def quantise_health(tank):
+        return max(0, round(255 * tank.health / tank.max_health))
+
+class Host:
+    def __init__(self, link, start_level=1):
+        self.link = link
+        self.game = HostGame(start_level)
+        self.client = None
+        self.last_received = 0  # Newest input seq seen from the client
+        self.last_applied = 0  # Newest input seq used by the simulation
+        self.input_queue = collections.deque()  # (seq, input) waiting for a tick
+        self.snapshot_ack = 0
+        self.client_time = 0
+        self.client_time_received = 0.0  # Host clock when client_time arrived
+        self.seq = 0
+        self.frame = 0  # Keeps counting after game over, unlike the game tick
+        self.history = collections.OrderedDict()
+
+    def poll(self):
+        for data, addr in self.link.receive():
+            if not data or data[0] != MSG_INPUT or len(data) < INPUT_HEADER.size:
+                continue
+            if self.client is None:
+                self.client = addr
+            if addr != self.client:
+                continue
+            _, input_seq, snapshot_ack, client_time, count = INPUT_HEADER.unpack_from(data)
+            if input_seq <= self.last_received or count > INPUT_REDUNDANCY:
+                continue  # Old, duplicated or malformed packet
+            inputs = data[INPUT_HEADER.size:]
+            if len(inputs) != count:
+                continue
+            self.snapshot_ack = max(self.snapshot_ack, snapshot_ack)
+            self.client_time = client_time
+            self.client_time_received = self.link.clock()
+            first_seq = input_seq - count + 1
+            for offset, value in enumerate(inputs):
+                if first_seq + offset > self.last_received:
+                    self.input_queue.append((first_seq + offset, value))
+            self.last_received = input_seq
+            while len(self.input_queue) > MAX_QUEUED_INPUTS:
+                self.input_queue.popleft()
+
+    def tick(self, dx, dy, fire):
+        self.poll()
+        self.game.apply_input(self.game.players[0], dx, dy, fire)
+        # The remote player gets at most one input per tick, like the local one
+        if self.input_queue:
+            self.last_applied, value = self.input_queue.popleft()
+            self.game.apply_input(self.game.players[1], *decode_input(value))
+        self.game.step()
+        self.frame += 1
+        state = self.game.state()
+        if self.client is not None and self.frame % SNAPSHOT_INTERVAL == 0:
+            self.send_snapshot(state)
+        return state
+
+    def send_snapshot(self, state):
+        self.seq += 1
+        baseline = self.snapshot_ack if self.snapshot_ack in self.history else 0
+        # Report how long the echoed timestamp waited here so the client can take it off the RTT
+        hold_ms = min(int((self.link.clock() - self.client_time_received) * 1000), 0xFFFF)
+        header = (self.seq, baseline, self.game.tick, self.last_applied, self.client_time, hold_ms,
+                  self.game.score, self.game.level, int(self.game.game_over))
+        self.link.send(encode_snapshot(header, state, self.history.get(baseline, {})), self.client)
+        self.history[self.seq] = state
+        while len(self.history) > HISTORY:
+            self.history.popitem(last=False)
+
+class Client:
+    def __init__(self, link, host_addr, clock=time.monotonic):
+        self.link = link
+        self.host_addr = host_addr
+        self.clock = clock
+        self.input_seq = 0
+        self.pending_inputs = collections.deque()
+        self.baselines = collections.OrderedDict()
+        self.timeline = collections.deque(maxlen=32)  # (tick, state) in arrival order
+        self.latest_seq = 0
+        self.snapshots_applied = 0
+        self.latest_header = None
+        self.render_tick = None
+        self.predicted = game.Player(0, 0)
+        self.has_tank = False
+
+    def tick(self, dx, dy, fire):
+        self.input_seq += 1
+        value = encode_input(dx, dy, fire)
+        self.pending_inputs.append((self.input_seq, value))
+        recent = [v for _, v in list(self.pending_inputs)[-INPUT_REDUNDANCY:]]
+        now_ms = int(self.clock() * 1000) & 0xFFFFFFFF
+        packet = INPUT_HEADER.pack(MSG_INPUT, self.input_seq, self.latest_seq, now_ms, len(recent)) + bytes(recent)
+        self.link.send(packet, self.host_addr)
+
+        if self.has_tank:
+            self.predicted.move(dx, dy)  # Predict our own tank straight away
+        self.poll()
+        if self.render_tick is not None:
+            self.render_tick += 1
+
+    def poll(self):
+        for data, addr in self.link.receive():
+            if addr != self.host_addr or not data or data[0] != MSG_SNAPSHOT:
+                continue
+            try:
+                seq = SNAPSHOT_HEADER.unpack_from(data)[1]
+                if seq <= self.latest_seq:
+                    continue  # Reordered behind a newer snapshot
+                decoded = decode_snapshot(data, self.baselines)
+            except struct.error:
+                continue  # Truncated packet
+            if decoded is None:
+                continue
+            header, state = decoded
+            self.on_snapshot(header, state)
+
+    def on_snapshot(self, header, state):
+        seq, _, tick, input_ack, echoed_ms, hold_ms, _, _, _ = header
+        self.latest_seq = seq
+        self.snapshots_applied += 1
+        self.latest_header = header
+        self.baselines[seq] = state
+        while len(self.baselines) > HISTORY:
+            self.baselines.popitem(last=False)
+        self.timeline.append((tick, state))
+
+        now_ms = int(self.clock() * 1000) & 0xFFFFFFFF
+        self.link.stats.record_rtt(max(((now_ms - echoed_ms) & 0xFFFFFFFF) - hold_ms, 0))
+
+        # Keep the render clock INTERP_DELAY behind the newest snapshot
+        target = tick - INTERP_DELAY
+        if self.render_tick is None or abs(self.render_tick - target) > INTERP_DELAY * 2:
+            self.render_tick = target
+        else:
+            self.render_tick += (target - self.render_tick) * 0.1
+
+        # Rewind our tank to the host's answer and replay inputs it has not seen
+        while self.pending_inputs and self.pending_inputs[0][0] <= input_ack:
+            self.pending_inputs.popleft()
+        own = state.get(2)
+        self.has_tank = own is not None
+        if own is not None:
+            self.predicted.rect.center = (own[1], own[2])
+            for _, value in self.pending_inputs:
+                dx, dy, _ = decode_input(value)
+                self.predicted.move(dx, dy)
+
+    def view(self):
+        """Returns the entities to draw: interpolated remote ones plus our predicted tank."""
+        if not self.timeline:
+            return []
+        older, newer = self.bracket(self.render_tick)
+        (t0, s0), (t1, s1) = older, newer
+        blend = 0.0 if t1 == t0 else min(max((self.render_tick - t0) / (t1 - t0), 0.0), 1.0)
+        render_tick = int(self.render_tick)
+
+        entities = []
+        for entity_id, fields in s0.items():
+            if entity_id == 2:
+                continue
+            kind = fields[0]
+            if kind >= KIND_BULLET:
+                entities.append(resolve(fields, render_tick))
+                continue
+            target = s1.get(entity_id, fields)
+            x = fields[1] + (target[1] - fields[1]) * blend
+            y = fields[2] + (target[2] - fields[2]) * blend
+            entities.append((kind, x, y, target[3], target[4]))
+
+        own = self.timeline[-1][1].get(2)
+        if own is not None:
+            entities.append((own[0], self.predicted.rect.centerx, self.predicted.rect.centery, own[3], own[4]))
+        return entities
+
+    def bracket(self, render_tick):
+        snapshots = sorted(self.timeline, key=lambda item: item[0])
+        older = snapshots[0]
+        for snapshot in snapshots:
+            if snapshot[0] > render_tick:
+                return older, snapshot
+            older = snapshot
+        return older, older
+
+def draw_view(screen, background, font, entities, header, local_kind, stats):
+    screen.blit(background, (0, 0))
+    for kind, x, y, a, b in entities:
+        if kind == KIND_BULLET:
+            image = game.assets["bullet"]
+        elif kind >= KIND_POWER_UP:
+            image = game.assets[POWER_UP_TYPES[kind - KIND_POWER_UP]]
+        else:
+            image = game.assets[TANK_IMAGES[kind]]
+        rect = image.get_rect(center=(int(x), int(y)))
+        screen.blit(image, rect)
+        if kind < KIND_BULLET:
+            pygame.draw.rect(screen, game.RED, (rect.x, rect.y - 10, rect.width, 5))
+            pygame.draw.rect(screen, game.GREEN, (rect.x, rect.y - 10, rect.width * a / 255, 5))
+
+    if header is not None:
+        score, level, game_over = header[6:9]
+        screen.blit(font.render(f"Score: {score}", True, game.WHITE), (10, 10))
+        screen.blit(font.render(f"Level: {level}", True, game.WHITE), (game.WIDTH - 100, 10))
+        own = [flags for kind, _, _, _, flags in entities if kind == local_kind]
+        if own:
+            screen.blit(font.render(f"Lives: {(own[0] >> 1) & 3}", True, game.WHITE), (10, 50))
+            screen.blit(font.render(f"Bullets: {own[0] >> 3}", True, game.WHITE), (10, 90))
+        if game_over:
+            game.show_game_over(screen, score, score)
+
+    summary = stats.summary()
+    rtt = "-" if summary["rtt_ms"] is None else f"{summary['rtt_ms']:.0f} ms"
+    net_text = f"up {summary['up_kbps']:.1f} kbit/s  down {summary['down_kbps']:.1f} kbit/s  rtt {rtt}"
+    screen.blit(font.render(net_text, True, game.WHITE), (10, game.HEIGHT - 30))
+
+def keyboard_input():
+    keys = pygame.key.get_pressed()
+    dx = keys[pygame.K_RIGHT] - keys[pygame.K_LEFT] or keys[pygame.K_d] - keys[pygame.K_a]
+    dy = keys[pygame.K_DOWN] - keys[pygame.K_UP] or keys[pygame.K_s] - keys[pygame.K_w]
+    return dx, dy, keys[pygame.K_SPACE]
+
+def run_window(role, step, view):
+    """Runs the window loop; step(dx, dy, fire) advances one tick, view() returns what to draw."""
+    screen = game.init_display()
+    pygame.display.set_caption(f"Tank Battle - {role}")
+    background = game.assets["background"]
+    font = pygame.font.Font(None, 30)
+    clock = pygame.time.Clock()
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+        step(*keyboard_input())
+        draw_view(screen, background, font, *view())
+        pygame.display.flip()
+        clock.tick(TICK_RATE)
+    pygame.quit()
+
+def make_link(args, bind_addr):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(bind_addr)
+    return LossyLink(sock, args.loss, args.delay / 1000, args.jitter / 1000)
+
+def run_host(args):
+    link = make_link(args, ("0.0.0.0", args.port))
+    host = Host(link, args.start_level)
+    state = {}
+
+    def step(dx, dy, fire):
+        nonlocal state
+        keys = pygame.key.get_pressed()
+        if keys[pygame.K_r] and host.game.game_over:
+            host.game.reset(args.start_level)
+        state = host.tick(dx, dy, fire)
+
+    def view():
+        header = (0, 0, host.game.tick, 0, 0, 0, host.game.score, host.game.level, int(host.game.game_over))
+        entities = [resolve(fields, host.game.tick) for fields in state.values()]
+        return entities, header, KIND_PLAYER1, link.stats
+
+    print(f"Hosting on UDP port {args.port}")
+    run_window("Host", step, view)
+
+def run_client(args):
+    link = make_link(args, ("0.0.0.0", 0))
+    client = Client(link, (socket.gethostbyname(args.host), args.port))
+
+    def view():
+        return client.view(), client.latest_header, KIND_PLAYER2, link.stats
+
+    run_window("Client", client.tick, view)
+
+def run_selftest(args):
+    """Plays host and client against each other on localhost under a simulated clock."""
+    now = [0.0]
+    clock = lambda: now[0]
+    rng = random.Random(args.seed)
+    random.seed(args.seed)
+
+    host_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    host_sock.bind(("127.0.0.1", 0))
+    client_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    client_sock.bind(("127.0.0.1", 0))
+    link_rng = random.Random(args.seed + 1)
+    host_link = LossyLink(host_sock, args.loss, args.delay / 1000, args.jitter / 1000, clock, link_rng)
+    client_link = LossyLink(client_sock, args.loss, args.delay / 1000, args.jitter / 1000, clock, link_rng)
+    host = Host(host_link, args.start_level)
+    client = Client(client_link, host_sock.getsockname(), clock)
+
+    snapshot_sizes = []
+    predicted = {}  # input seq -> where the client predicted its tank
+    authoritative = {}  # input seq -> where the host put it after that input
+    host_direction = client_direction = 0
+    for tick in range(args.seconds * TICK_RATE):
+        # Both bots keep firing and pick a new direction every half second
+        if tick % 30 == 0:
+            host_direction = rng.choice([-1, 0, 1])
+            client_direction = rng.choice([-1, 0, 1])
+
+        before = host_link.stats.bytes_sent
+        host.tick(0, host_direction, True)
+        if host_link.stats.bytes_sent != before:
+            snapshot_sizes.append(host_link.stats.bytes_sent - before)
+        if host.game.players[1].lives > 0:
+            authoritative[host.last_applied] = host.game.players[1].rect.center
+
+        client.tick(rng.choice([-1, 0, 1]), client_direction, True)
+        if client.has_tank:
+            predicted[client.input_seq] = client.predicted.rect.center
+        host.poll()  # Read the input as it lands rather than a whole tick later
+        now[0] += 1 / TICK_RATE
+
+    seconds = args.seconds
+    host_summary = host_link.stats.summary()
+    client_summary = client_link.stats.summary()
+    print(f"Simulated {seconds} s, loss {args.loss:.0%}, delay {args.delay} ms, jitter {args.jitter} ms")
+    print(f"Host -> client: {host_summary['up_kbps']:.2f} kbit/s incl. UDP/IP headers, {host_summary['packets_sent']} snapshots, "
+          f"{host_summary['packets_dropped']} dropped")
+    if snapshot_sizes:
+        print(f"Snapshot payload bytes: mean {sum(snapshot_sizes) / len(snapshot_sizes):.1f}, "
+              f"max {max(snapshot_sizes)}")
+    print(f"Client -> host: {client_summary['up_kbps']:.2f} kbit/s incl. UDP/IP headers, {client_summary['packets_sent']} inputs, "
+          f"{client_summary['packets_dropped']} dropped")
+    rtt = client_summary["rtt_ms"]
+    print(f"Round trip: {'n/a' if rtt is None else f'{rtt:.0f} ms'}")
+    print(f"Snapshots applied by client: {client.snapshots_applied} of {host.seq}")
+    prediction_errors = [math.dist(predicted[seq], authoritative[seq]) for seq in predicted if seq in authoritative]
+    if prediction_errors:
+        print(f"Prediction error vs host: mean {sum(prediction_errors) / len(prediction_errors):.2f} px, "
+              f"max {max(prediction_errors):.2f} px")
+    print(f"Host level {host.game.level}, score {host.game.score}, game over {host.game.game_over}")
+
+def parse_start_level(text):
+    if text == "boss":
+        return text
+    level = int(text)
+    if level not in game.LEVEL_CONFIG:
+        raise argparse.ArgumentTypeError(f"unknown level {text}")
+    return level
+
+def main():
+    parser = argparse.ArgumentParser(description="Two-player Tank Battle over UDP")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    host_parser = subparsers.add_parser("host", help="run the authoritative game for two players")
+    join_parser = subparsers.add_parser("join", help="join a host as the second player")
+    join_parser.add_argument("host", help="host name or address")
+    test_parser = subparsers.add_parser("selftest", help="play host and client headless over localhost")
+    test_parser.add_argument("--seconds", type=int, default=60, help="simulated game time")
+    test_parser.add_argument("--seed", type=int, default=0)
+
+    for sub in (host_parser, join_parser, test_parser):
+        sub.add_argument("--port", type=int, default=50007)
+        sub.add_argument("--loss", type=float, default=0.0, help="chance of dropping each outgoing packet")
+        sub.add_argument("--delay", type=float, default=0.0, help="added one-way delay in ms")
+        sub.add_argument("--jitter", type=float, default=0.0, help="extra random delay in ms")
+    for sub in (host_parser, test_parser):
+        sub.add_argument("--start-level", type=parse_start_level, default=1, help="1, 2, 3 or boss")
+    args = parser.parse_args()
+
+    if args.command == "host":
+        run_host(args)
+    elif args.command == "join":
+        run_client(args)
+    else:
+        run_selftest(args)
+
+if __name__ == "__main__":
+    main()